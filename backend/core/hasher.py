@@ -1,8 +1,43 @@
+import asyncio
 import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Protocol, Tuple
 
+# Large enough that hashlib releases the GIL on every update().
+STREAM_CHUNK_SIZE = 256 * 1024
 
-def generate_hash(data: bytes, chunk_size: int = 8192) -> str:
+
+class AsyncReadable(Protocol):
+    async def read(self, size: int = -1) -> bytes: ...
+
+
+_hash_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="hasher")
+
+
+def generate_hash(data: bytes) -> str:
+    return hashlib.sha3_512(data).hexdigest()
+
+
+async def generate_hash_stream(
+    stream: AsyncReadable,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    sink: Optional[Callable[[bytes], None]] = None,
+) -> Tuple[str, int]:
     sha3 = hashlib.sha3_512()
-    for index in range(0, len(data), chunk_size):
-        sha3.update(data[index : index + chunk_size])
-    return sha3.hexdigest()
+
+    def consume(chunk: bytes) -> None:
+        sha3.update(chunk)
+        if sink is not None:
+            sink(chunk)
+
+    # Chunks are consumed one at a time off the event loop, so ordering is preserved.
+    loop = asyncio.get_running_loop()
+    size = 0
+    while True:
+        chunk = await stream.read(chunk_size)
+        if not chunk:
+            break
+        await loop.run_in_executor(_hash_pool, consume, chunk)
+        size += len(chunk)
+    return sha3.hexdigest(), size
@@ -2,10 +2,14 @@ from __future__ import annotations
 
 from typing import Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
-class HealthResponse(BaseModel):
+class _FrozenModel(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
+
+class HealthResponse(_FrozenModel):
     status: str
     environment: str
     pqc_algorithm: str
@@ -14,7 +18,7 @@ class HealthResponse(BaseModel):
     supabase_enabled: bool
 
 
-class ProofResponse(BaseModel):
+class ProofResponse(_FrozenModel):
     verification_id: str
     filename: str
     size_bytes: int
@@ -27,7 +31,12 @@ class ProofResponse(BaseModel):
     created_at: str
 
 
-class VerifyResponse(BaseModel):
+class BatchProofResponse(_FrozenModel):
+    items: list[ProofResponse]
+    count: int
+
+
+class VerifyResponse(_FrozenModel):
     verification_id: str
     status: Literal["VERIFIED", "TAMPERED"]
     signature_valid: bool
@@ -35,7 +44,7 @@ class VerifyResponse(BaseModel):
     detail: str = Field(default="")
 
 
-class ProfileResponse(BaseModel):
+class ProfileResponse(_FrozenModel):
     email: str
     handle: str
     display_name: str
@@ -52,14 +61,14 @@ class ProfileUpdateRequest(BaseModel):
     avatar_url: Optional[str] = None
 
 
-class ShareLinkResponse(BaseModel):
+class ShareLinkResponse(_FrozenModel):
     verification_id: str
     share_token: str
     share_url: str
     auto_delete_at: Optional[str] = None
 
 
-class SharedProofResponse(BaseModel):
+class SharedProofResponse(_FrozenModel):
     verification_id: str
     filename: str
     pqc_algorithm: str
@@ -67,7 +76,7 @@ class SharedProofResponse(BaseModel):
     created_at: str
 
 
-class SharedVerifyResponse(BaseModel):
+class SharedVerifyResponse(_FrozenModel):
     verification_id: str
     status: Literal["VERIFIED", "TAMPERED"]
     signature_valid: bool
@@ -78,7 +87,7 @@ class SharedVerifyResponse(BaseModel):
     auto_delete_at: Optional[str] = None
 
 
-class NotificationItem(BaseModel):
+class NotificationItem(_FrozenModel):
     id: int
     verification_id: str
     event_type: str
@@ -89,12 +98,12 @@ class NotificationItem(BaseModel):
     read_at: Optional[str] = None
 
 
-class NotificationsResponse(BaseModel):
+class NotificationsResponse(_FrozenModel):
     items: list[NotificationItem]
     count: int
 
 
-class DeleteProofResponse(BaseModel):
+class DeleteProofResponse(_FrozenModel):
     deleted: bool
     verification_id: str
     detail: str
@@ -1,31 +1,35 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set
 
+import orjson
 import websockets
 from fastapi import WebSocket
 
 logger = logging.getLogger(__name__)
 
+PEER_QUEUE_SIZE = 128
+PEER_RECONNECT_MIN_SECONDS = 1.0
+PEER_RECONNECT_MAX_SECONDS = 60.0
+WS_SEND_TIMEOUT_SECONDS = 5.0
+
 
 class ConnectionManager:
     def __init__(self) -> None:
-        self._connections: List[WebSocket] = []
+        self._connections: Set[WebSocket] = set()
         self._lock = asyncio.Lock()
 
     async def connect(self, websocket: WebSocket) -> None:
         await websocket.accept()
         async with self._lock:
-            self._connections.append(websocket)
+            self._connections.add(websocket)
 
     async def disconnect(self, websocket: WebSocket) -> None:
         async with self._lock:
-            if websocket in self._connections:
-                self._connections.remove(websocket)
+            self._connections.discard(websocket)
 
     async def broadcast(self, event_type: str, payload: Dict[str, Any]) -> None:
         envelope = {
@@ -33,33 +37,103 @@ class ConnectionManager:
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "payload": payload,
         }
-        dead_connections: List[WebSocket] = []
+        body = orjson.dumps(envelope).decode("utf-8")
+        async with self._lock:
+            snapshot = list(self._connections)
+        if not snapshot:
+            return
+        # A stalled client times out and is pruned instead of holding up the whole fan-out.
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(websocket.send_text(body), WS_SEND_TIMEOUT_SECONDS)
+                for websocket in snapshot
+            ),
+            return_exceptions=True,
+        )
+        dead_connections = [
+            websocket
+            for websocket, result in zip(snapshot, results)
+            if isinstance(result, Exception)
+        ]
+        if not dead_connections:
+            return
         async with self._lock:
-            for websocket in self._connections:
-                try:
-                    await websocket.send_json(envelope)
-                except Exception:
-                    dead_connections.append(websocket)
-            for websocket in dead_connections:
-                self._connections.remove(websocket)
+            self._connections.difference_update(dead_connections)
+        # Close pruned sockets so slow-but-live clients notice and reconnect.
+        await asyncio.gather(
+            *(websocket.close(code=1013) for websocket in dead_connections),
+            return_exceptions=True,
+        )
 
 
 class PeerBroadcaster:
     def __init__(self, peers: List[str]):
         self.peers = peers
+        self._queues: Dict[str, asyncio.Queue[str]] = {}
+        self._tasks: List[asyncio.Task[None]] = []
+
+    async def start(self) -> None:
+        for peer_url in self.peers:
+            queue: asyncio.Queue[str] = asyncio.Queue(maxsize=PEER_QUEUE_SIZE)
+            self._queues[peer_url] = queue
+            self._tasks.append(asyncio.create_task(self._run_peer(peer_url, queue)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._queues.clear()
 
     async def broadcast_integrity_proof(self, proof_payload: Dict[str, Any]) -> None:
-        if not self.peers:
+        if not self._queues:
             return
-        message = json.dumps(
-            {"type": "integrity_proof", "data": proof_payload}, separators=(",", ":")
-        )
-        tasks = [self._send(peer, message) for peer in self.peers]
-        await asyncio.gather(*tasks, return_exceptions=True)
+        message = orjson.dumps({"type": "integrity_proof", "data": proof_payload}).decode("utf-8")
+        for peer_url, queue in self._queues.items():
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                logger.debug("Peer queue full for %s; dropping proof broadcast.", peer_url)
+
+    async def _run_peer(self, peer_url: str, queue: asyncio.Queue[str]) -> None:
+        # One long-lived connection per peer; reconnect with exponential backoff.
+        backoff = PEER_RECONNECT_MIN_SECONDS
+        pending: Optional[str] = None
+        while True:
+            try:
+                async with websockets.connect(
+                    peer_url, ping_interval=20, ping_timeout=20, compression=None
+                ) as ws:
+                    backoff = PEER_RECONNECT_MIN_SECONDS
+                    # Peers push their own events to us; keep reading so unread frames
+                    # don't stall the client's reader and its keepalive pongs.
+                    drain = asyncio.create_task(self._drain_peer(ws))
+                    try:
+                        while True:
+                            if pending is None:
+                                next_message = asyncio.ensure_future(queue.get())
+                                await asyncio.wait(
+                                    {next_message, drain}, return_when=asyncio.FIRST_COMPLETED
+                                )
+                                if not next_message.done():
+                                    next_message.cancel()
+                                    break
+                                pending = next_message.result()
+                            await ws.send(pending)
+                            pending = None
+                    finally:
+                        drain.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.debug("Peer connection to %s failed: %s", peer_url, exc)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, PEER_RECONNECT_MAX_SECONDS)
 
-    async def _send(self, peer_url: str, message: str) -> None:
+    @staticmethod
+    async def _drain_peer(ws: Any) -> None:
         try:
-            async with websockets.connect(peer_url, ping_interval=20, ping_timeout=20) as ws:
-                await ws.send(message)
-        except Exception as exc:
-            logger.debug("Peer broadcast failed for %s: %s", peer_url, exc)
+            async for _ in ws:
+                pass
+        except websockets.ConnectionClosed:
+            pass
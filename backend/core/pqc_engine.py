@@ -10,8 +10,13 @@ Fallback backend:
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 
 from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
@@ -22,6 +27,18 @@ except Exception:  # pragma: no cover
     oqs = None
 
 
+@lru_cache(maxsize=256)
+def _decode_public_key(public_key_b64: str) -> bytes:
+    # Ledger rows repeat a handful of signer keys, so decode each one once.
+    return base64.b64decode(public_key_b64.encode("utf-8"))
+
+
+@lru_cache(maxsize=1024)
+def _decode_signature(signature_b64: str) -> bytes:
+    # Shared links re-verify the same stored signature on every recheck.
+    return base64.b64decode(signature_b64.encode("utf-8"))
+
+
 @dataclass(frozen=True)
 class EngineInfo:
     algorithm: str
@@ -41,9 +58,31 @@ class PQCEngine:
         self._private_key_fallback: ed25519.Ed25519PrivateKey | None = None
         self._public_key_fallback: ed25519.Ed25519PublicKey | None = None
 
+        # The keypair is fixed for the engine's lifetime; encode it once.
+        self._public_key_bytes: bytes | None = None
+        self._public_key_b64: str | None = None
+
+        # liboqs contexts are not thread-safe, so each thread keeps its own.
+        self._local = threading.local()
+        # Signing stays in-process: the keypair is generated per process at startup.
+        self._executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 4, thread_name_prefix="pqc"
+        )
+
         self._setup()
 
     def _setup(self) -> None:
+        self._generate_keypair()
+        if self._fallback_active and self._public_key_fallback is not None:
+            self._public_key_bytes = self._public_key_fallback.public_bytes(
+                encoding=Encoding.Raw, format=PublicFormat.Raw
+            )
+        else:
+            self._public_key_bytes = self._public_key_oqs
+        if self._public_key_bytes is not None:
+            self._public_key_b64 = base64.b64encode(self._public_key_bytes).decode("utf-8")
+
+    def _generate_keypair(self) -> None:
         if oqs is not None:
             enabled = set(oqs.get_enabled_sig_mechanisms())
             if self.algorithm in enabled:
@@ -59,6 +98,20 @@ class PQCEngine:
         self._fallback_active = True
         self._backend = "ed25519-fallback"
 
+    def _oqs_signer(self) -> "oqs.Signature":
+        signer = getattr(self._local, "signer", None)
+        if signer is None:
+            signer = oqs.Signature(self.algorithm, secret_key=self._private_key_oqs)
+            self._local.signer = signer
+        return signer
+
+    def _oqs_verifier(self) -> "oqs.Signature":
+        verifier = getattr(self._local, "verifier", None)
+        if verifier is None:
+            verifier = oqs.Signature(self.algorithm)
+            self._local.verifier = verifier
+        return verifier
+
     @property
     def info(self) -> EngineInfo:
         return EngineInfo(
@@ -73,36 +126,21 @@ class PQCEngine:
             return self._private_key_fallback.sign(payload)
         if self._private_key_oqs is None:
             raise RuntimeError("PQC private key is not initialized.")
-        with oqs.Signature(self.algorithm, secret_key=self._private_key_oqs) as signer:
-            return signer.sign(payload)
+        return self._oqs_signer().sign(payload)
 
     def verify_hash(self, signature: bytes, hash_value: str) -> bool:
-        if self._fallback_active:
-            if self._public_key_fallback is None:
-                return False
-            return self.verify_hash_with_public_key(
-                signature=signature,
-                hash_value=hash_value,
-                public_key_b64=base64.b64encode(
-                    self._public_key_fallback.public_bytes(
-                        encoding=Encoding.Raw, format=PublicFormat.Raw
-                    )
-                ).decode("utf-8"),
-            )
-        if self._public_key_oqs is None:
+        if self._public_key_bytes is None:
             return False
-        return self.verify_hash_with_public_key(
-            signature=signature,
-            hash_value=hash_value,
-            public_key_b64=base64.b64encode(self._public_key_oqs).decode("utf-8"),
-        )
+        return self._verify_raw(signature, hash_value.encode("utf-8"), self._public_key_bytes)
 
     def verify_hash_with_public_key(
         self, signature: bytes, hash_value: str, public_key_b64: str
     ) -> bool:
-        payload = hash_value.encode("utf-8")
-        public_key = base64.b64decode(public_key_b64.encode("utf-8"))
+        return self._verify_raw(
+            signature, hash_value.encode("utf-8"), _decode_public_key(public_key_b64)
+        )
 
+    def _verify_raw(self, signature: bytes, payload: bytes, public_key: bytes) -> bool:
         if self._fallback_active:
             try:
                 public_key_object = ed25519.Ed25519PublicKey.from_public_bytes(public_key)
@@ -114,21 +152,37 @@ class PQCEngine:
         if oqs is None:
             return False
 
-        with oqs.Signature(self.algorithm) as verifier:
-            try:
-                return verifier.verify(payload, signature, public_key)
-            except Exception:
-                return False
+        try:
+            return self._oqs_verifier().verify(payload, signature, public_key)
+        except Exception:
+            return False
+
+    async def sign_hash_async(self, hash_value: str) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.sign_hash, hash_value)
+
+    async def verify_hash_async(self, signature: bytes, hash_value: str) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.verify_hash, signature, hash_value
+        )
+
+    async def verify_hash_with_public_key_async(
+        self, signature: bytes, hash_value: str, public_key_b64: str
+    ) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            self.verify_hash_with_public_key,
+            signature,
+            hash_value,
+            public_key_b64,
+        )
 
     def export_public_key_b64(self) -> str:
-        if self._fallback_active and self._public_key_fallback is not None:
-            raw = self._public_key_fallback.public_bytes(
-                encoding=Encoding.Raw, format=PublicFormat.Raw
-            )
-            return base64.b64encode(raw).decode("utf-8")
-        if self._public_key_oqs is None:
+        if self._public_key_b64 is None:
             raise RuntimeError("Public key not initialized.")
-        return base64.b64encode(self._public_key_oqs).decode("utf-8")
+        return self._public_key_b64
 
     @staticmethod
     def encode_signature_b64(signature: bytes) -> str:
@@ -136,4 +190,4 @@ class PQCEngine:
 
     @staticmethod
     def decode_signature_b64(signature_b64: str) -> bytes:
-        return base64.b64decode(signature_b64.encode("utf-8"))
+        return _decode_signature(signature_b64)
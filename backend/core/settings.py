@@ -1,4 +1,4 @@
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import List
 
@@ -32,10 +32,17 @@ class Settings(BaseSettings):
 
     vault_master_key: str = ""
     pqc_algorithm: str = "ML-DSA-65"
+    pqc_self_verify_on_sign: bool = False
 
     p2p_peers: str = ""
     public_app_url: str = "http://localhost:5173"
     auto_delete_after_recheck_hours: int = 24
+    cleanup_interval_seconds: int = 30
+
+    repository_cache_size: int = 1024
+    repository_cache_ttl_seconds: int = 60
+    auth_cache_size: int = 10_000
+    auth_cache_ttl_seconds: int = 30
 
     @field_validator("app_env")
     @classmethod
@@ -46,11 +53,11 @@ class Settings(BaseSettings):
             return "development"
         return lowered
 
-    @property
+    @cached_property
     def cors_origins_list(self) -> List[str]:
         return [item.strip() for item in self.cors_origins.split(",") if item.strip()]
 
-    @property
+    @cached_property
     def p2p_peers_list(self) -> List[str]:
         return [item.strip() for item in self.p2p_peers.split(",") if item.strip()]
 
@@ -1,32 +1,155 @@
 from __future__ import annotations
 
-import json
+import bisect
+import io
+import itertools
 import logging
+import os
+import queue
 import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Deque, Dict, Iterator, List, Optional, Set, Tuple, Union
 
-from supabase import Client, create_client
+import orjson
+from cachetools import TTLCache
+from postgrest.exceptions import APIError
+from supabase import Client, ClientOptions, create_client
 
 from .settings import Settings
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows dev machines run a single worker
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+SUPABASE_CLIENT_TIMEOUT_SECONDS = 30
+LOCAL_NOTIFICATIONS_PER_OWNER = 10_000
+VAULT_IO_BUFFER_SIZE = 1 << 20
+NOTIFICATION_BATCH_SIZE = 50
+NOTIFICATION_FLUSH_SECONDS = 0.1
+NOTIFICATION_QUEUE_SIZE = 1_000
+# Postgres data (22xxx) and integrity (23xxx) errors are caused by a specific row.
+_ROW_ERROR_CLASSES = ("22", "23")
+
+_FLUSH_STOP = object()
+
+_BACKEND_ROOT = Path(__file__).resolve().parent.parent
+_NODE_A_LEDGER = _BACKEND_ROOT / "storage" / "node_A" / "ledger.jsonl"
+_NODE_B_LEDGER = _BACKEND_ROOT / "storage" / "node_B" / "ledger.jsonl"
+_LEDGER_LOCK = _BACKEND_ROOT / "storage" / "ledger.lock"
+
+_HANDLE_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789_.-")
+# Deletes every other ASCII character in one pass; non-ASCII input falls back to the regex.
+_HANDLE_ASCII_TABLE = str.maketrans(
+    "", "", "".join(chr(code) for code in range(128) if chr(code) not in _HANDLE_CHARS)
+)
+_HANDLE_RE = re.compile(r"[^a-z0-9_.-]+")
+_SCHEMA_ERROR_RE = re.compile(
+    r"does not exist|schema cache|could not find the table", re.IGNORECASE
+)
+
+# One client (and its HTTP connection pools) per project/key for the whole process.
+_client_cache: Dict[Tuple[str, str], Client] = {}
+_client_cache_lock = threading.Lock()
+
+
+def _shared_client(url: str, key: str) -> Client:
+    with _client_cache_lock:
+        client = _client_cache.get((url, key))
+        if client is None:
+            client = create_client(
+                url,
+                key,
+                options=ClientOptions(
+                    postgrest_client_timeout=SUPABASE_CLIENT_TIMEOUT_SECONDS,
+                    storage_client_timeout=SUPABASE_CLIENT_TIMEOUT_SECONDS,
+                ),
+            )
+            _client_cache[(url, key)] = client
+        return client
+
+
+def _created_at_key(proof: Dict[str, Any]) -> str:
+    return proof.get("created_at") or ""
+
+
+def _remove_identical(items: List[Dict[str, Any]], target: Dict[str, Any]) -> None:
+    for position, item in enumerate(items):
+        if item is target:
+            del items[position]
+            return
+
 
 class SupabaseRepository:
     def __init__(self, settings: Settings):
         self.settings = settings
         self.client: Optional[Client] = None
         self._configure_client()
-        backend_root = Path(__file__).resolve().parent.parent
-        self._node_a_path = backend_root / "storage" / "node_A" / "ledger.json"
-        self._node_b_path = backend_root / "storage" / "node_B" / "ledger.json"
+        self._node_a_path = _NODE_A_LEDGER
+        self._node_b_path = _NODE_B_LEDGER
         self._local_profiles: Dict[str, Dict[str, Any]] = {}
-        self._local_notifications: List[Dict[str, Any]] = []
+        # Newest first per owner; local notifications arrive in created_at order.
+        self._local_notifications: Dict[str, Deque[Dict[str, Any]]] = defaultdict(
+            lambda: deque(maxlen=LOCAL_NOTIFICATIONS_PER_OWNER)
+        )
+        self._notification_ids = itertools.count(1)
+        self._notification_queue: queue.Queue[Any] = queue.Queue(maxsize=NOTIFICATION_QUEUE_SIZE)
+        self._notification_flusher: Optional[threading.Thread] = None
+        self._notification_lock = threading.Lock()
         self._local_verification_checks: List[Dict[str, Any]] = []
         self._memory_share_links: Dict[str, str] = {}
+        self._tokens_by_vid: Dict[str, Set[str]] = defaultdict(set)
         self._schema_warning_cache: set[str] = set()
+        self._proof_index: Dict[str, Dict[str, Any]] = {}
+        self._proofs_by_recency: List[Dict[str, Any]] = []
+        self._proofs_by_owner: Dict[str, List[Dict[str, Any]]] = {}
+        # Read-through caches for Supabase mode; local mode is served from the index.
+        # Share-token lookups are never cached: a deleted or disabled link must stop
+        # working immediately, even when another worker or the frontend revoked it.
+        cache_size = settings.repository_cache_size
+        cache_ttl = settings.repository_cache_ttl_seconds
+        self._proof_cache: TTLCache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._profile_cache: TTLCache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._cache_lock = threading.Lock()
+        self._ledger_stamp: Optional[Tuple[int, int, int]] = None
+        # Local-mode index and ledger files are touched from the event loop, request
+        # threads, the cleanup task and other workers; every sync, mutation and rewrite
+        # runs under _ledger_guard().
+        self._ledger_lock = threading.RLock()
+        self._ledger_lock_path = _LEDGER_LOCK
+        self._ledger_lock_depth = 0
+        with self._ledger_guard():
+            self._migrate_legacy_ledgers()
+            self._compact_local_ledgers()
+            self._sync_local_index()
+
+    @contextmanager
+    def _ledger_guard(self) -> Iterator[None]:
+        # Thread lock for this process, plus an flock on a sidecar file so other workers
+        # never interleave with a sync -> mutate -> rewrite sequence. The lock file is
+        # opened per acquisition: a descriptor inherited across fork would share the lock.
+        with self._ledger_lock:
+            handle = None
+            if self._ledger_lock_depth == 0 and fcntl is not None:
+                self._ledger_lock_path.parent.mkdir(parents=True, exist_ok=True)
+                handle = open(self._ledger_lock_path, "ab")
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            self._ledger_lock_depth += 1
+            try:
+                yield
+            finally:
+                self._ledger_lock_depth -= 1
+                if handle is not None:
+                    handle.close()
 
     @property
     def enabled(self) -> bool:
@@ -36,7 +159,7 @@ class SupabaseRepository:
         if not self.settings.is_supabase_configured:
             logger.warning("Supabase is not configured. Running in local ledger mode.")
             return
-        self.client = create_client(self.settings.supabase_url, self.settings.supabase_key)
+        self.client = _shared_client(self.settings.supabase_url, self.settings.supabase_key)
 
     def get_user_from_token(self, access_token: str) -> Optional[Dict[str, str]]:
         if not self.client:
@@ -58,11 +181,18 @@ class SupabaseRepository:
     def insert_proof(self, proof: Dict[str, Any]) -> None:
         if self.client:
             self.client.table(self.settings.supabase_table).insert(proof).execute()
+            self._forget_proof(proof)
             return
-        self._append_local_ledgers(proof)
+        with self._ledger_guard():
+            self._sync_local_index()
+            self._append_local_ledgers(proof)
+            self._index_proof(proof)
 
-    def get_proof(self, verification_id: str) -> Optional[Dict[str, Any]]:
+    def get_proof(self, verification_id: str, fresh: bool = False) -> Optional[Dict[str, Any]]:
         if self.client:
+            cached = None if fresh else self._cache_get(self._proof_cache, verification_id)
+            if cached is not None:
+                return cached
             response = (
                 self.client.table(self.settings.supabase_table)
                 .select("*")
@@ -71,13 +201,14 @@ class SupabaseRepository:
                 .execute()
             )
             data = response.data or []
-            return data[0] if data else None
+            if not data:
+                return None
+            self._cache_put(self._proof_cache, verification_id, data[0])
+            return data[0]
 
-        proofs = self._read_local_proofs()
-        for proof in proofs:
-            if proof.get("verification_id") == verification_id:
-                return proof
-        return None
+        with self._ledger_guard():
+            self._sync_local_index()
+            return self._proof_index.get(verification_id)
 
     def list_proofs(self, owner_email: Optional[str], limit: int = 100) -> List[Dict[str, Any]]:
         if self.client:
@@ -91,14 +222,19 @@ class SupabaseRepository:
                 query = query.eq("owner_email", owner_email)
             response = query.execute()
             return response.data or []
-        proofs = self._read_local_proofs()
-        if owner_email:
-            proofs = [item for item in proofs if item.get("owner_email") == owner_email]
-        proofs.sort(key=lambda item: item.get("created_at", ""), reverse=True)
-        return proofs[:limit]
+        with self._ledger_guard():
+            self._sync_local_index()
+            if owner_email:
+                proofs = self._proofs_by_owner.get(owner_email, [])
+            else:
+                proofs = self._proofs_by_recency
+            return proofs[-limit:][::-1]
 
     def get_or_create_profile(self, user_id: str, email: str) -> Dict[str, Any]:
         if self.client:
+            cached = self._cache_get(self._profile_cache, user_id)
+            if cached is not None:
+                return cached
             try:
                 response = (
                     self.client.table("user_profiles")
@@ -109,6 +245,7 @@ class SupabaseRepository:
                 )
                 data = response.data or []
                 if data:
+                    self._cache_put(self._profile_cache, user_id, data[0])
                     return data[0]
 
                 default_profile = self._default_profile(user_id, email)
@@ -146,6 +283,7 @@ class SupabaseRepository:
                     .eq("email", email)
                     .execute()
                 )
+                self._cache_pop(self._profile_cache, user_id)
                 data = response.data or []
                 if data:
                     return data[0]
@@ -188,7 +326,7 @@ class SupabaseRepository:
                 )
                 verification_id = self._memory_share_links.get(share_token)
                 if verification_id:
-                    proof = self.get_proof(verification_id)
+                    proof = self.get_proof(verification_id, fresh=True)
                     if proof:
                         return {
                             **proof,
@@ -196,10 +334,11 @@ class SupabaseRepository:
                             "share_enabled": True,
                         }
 
-        proofs = self._read_local_proofs()
-        for proof in proofs:
-            if proof.get("share_token") == share_token and proof.get("share_enabled"):
-                return proof
+        with self._ledger_guard():
+            self._sync_local_index()
+            for proof in self._proofs_by_recency:
+                if proof.get("share_token") == share_token and proof.get("share_enabled"):
+                    return proof
         return None
 
     def enable_share_link(self, verification_id: str, owner_email: str, share_token: str) -> Optional[Dict[str, Any]]:
@@ -217,6 +356,7 @@ class SupabaseRepository:
                     .eq("owner_email", owner_email)
                     .execute()
                 )
+                self._forget_proof({"verification_id": verification_id, "share_token": share_token})
                 data = response.data or []
                 return data[0] if data else None
             except Exception as exc:
@@ -228,7 +368,8 @@ class SupabaseRepository:
                     exc,
                 )
                 self._memory_share_links[share_token] = verification_id
-                proof = self.get_proof(verification_id)
+                self._tokens_by_vid[verification_id].add(share_token)
+                proof = self.get_proof(verification_id, fresh=True)
                 if proof:
                     return {
                         **proof,
@@ -240,20 +381,14 @@ class SupabaseRepository:
                     **payload,
                 }
 
-        proofs = self._read_local_proofs()
-        target = None
-        for proof in proofs:
-            if (
-                proof.get("verification_id") == verification_id
-                and proof.get("owner_email") == owner_email
-            ):
-                proof.update(payload)
-                target = proof
-                break
-        if target is None:
-            return None
-        self._overwrite_local_ledgers(proofs)
-        return target
+        with self._ledger_guard():
+            self._sync_local_index()
+            target = self._proof_index.get(verification_id)
+            if target is None or target.get("owner_email") != owner_email:
+                return None
+            target.update(payload)
+            self._overwrite_local_ledgers(self._proofs_by_recency)
+            return target
 
     def record_external_check(
         self,
@@ -264,7 +399,10 @@ class SupabaseRepository:
         status: str,
         detail: str,
         auto_delete_after_hours: int,
+        now: Optional[datetime] = None,
     ) -> Dict[str, Any]:
+        now = now or datetime.now(timezone.utc)
+        now_iso = now.isoformat()
         verification_id = proof["verification_id"]
         share_token = proof.get("share_token") or ""
         check_row = {
@@ -276,7 +414,7 @@ class SupabaseRepository:
             "expected_hash_sha3_512": proof["hash_sha3_512"],
             "status": status,
             "detail": detail,
-            "created_at": self.now_iso(),
+            "created_at": now_iso,
         }
 
         if self.client:
@@ -295,17 +433,17 @@ class SupabaseRepository:
             self._local_verification_checks.append(check_row)
 
         next_count = int(proof.get("external_check_count") or 0) + 1
-        now = datetime.now(timezone.utc)
         auto_delete_at = proof.get("auto_delete_at")
         if not auto_delete_at:
             auto_delete_at = (now + timedelta(hours=auto_delete_after_hours)).isoformat()
         patch = {
             "external_check_count": next_count,
-            "last_external_check_at": now.isoformat(),
+            "last_external_check_at": now_iso,
             "auto_delete_at": auto_delete_at,
         }
 
         if self.client:
+            data = []
             try:
                 updated = (
                     self.client.table(self.settings.supabase_table)
@@ -313,11 +451,8 @@ class SupabaseRepository:
                     .eq("verification_id", verification_id)
                     .execute()
                 )
+                self._forget_proof(proof)
                 data = updated.data or []
-                if data:
-                    proof = data[0]
-                else:
-                    proof = {**proof, **patch}
             except Exception as exc:
                 if not self._is_schema_compat_error(exc):
                     raise
@@ -326,15 +461,20 @@ class SupabaseRepository:
                     "New share/cleanup columns are missing on integrity_proofs. Runtime will continue without persisted external-check counters.",
                     exc,
                 )
-                proof = {**proof, **patch}
+            if data:
+                proof = data[0]
+            else:
+                # The caller's dict may be a shared cache entry, so patch a copy.
+                proof = dict(proof)
+                proof.update(patch)
         else:
-            proofs = self._read_local_proofs()
-            for item in proofs:
-                if item.get("verification_id") == verification_id:
+            with self._ledger_guard():
+                self._sync_local_index()
+                item = self._proof_index.get(verification_id)
+                if item is not None:
                     item.update(patch)
                     proof = item
-                    break
-            self._overwrite_local_ledgers(proofs)
+                    self._overwrite_local_ledgers(self._proofs_by_recency)
 
         return proof
 
@@ -346,6 +486,8 @@ class SupabaseRepository:
         checker_email: str,
         is_tampered: bool,
         message: str,
+        wait: bool = False,
+        now: Optional[datetime] = None,
     ) -> Dict[str, Any]:
         payload = {
             "owner_email": owner_email,
@@ -354,8 +496,12 @@ class SupabaseRepository:
             "checker_email": checker_email,
             "is_tampered": is_tampered,
             "message": message,
-            "created_at": self.now_iso(),
+            "created_at": (now or datetime.now(timezone.utc)).isoformat(),
         }
+        if self.client and not wait:
+            # Batched by the background flusher; the caller gets the payload without an id.
+            self._enqueue_notification(payload)
+            return payload
         if self.client:
             try:
                 response = self.client.table("user_notifications").insert(payload).execute()
@@ -369,10 +515,96 @@ class SupabaseRepository:
                     "Table user_notifications is missing. Notification write will fallback to local memory.",
                     exc,
                 )
-        payload["id"] = len(self._local_notifications) + 1
-        self._local_notifications.append(payload)
+        return self._store_local_notification(payload)
+
+    def close(self) -> None:
+        with self._notification_lock:
+            flusher = self._notification_flusher
+            self._notification_flusher = None
+        if flusher is None:
+            return
+        try:
+            self._notification_queue.put(_FLUSH_STOP, timeout=5)
+        except queue.Full:
+            logger.warning("Notification queue still full at shutdown; pending notifications are dropped.")
+            return
+        flusher.join(timeout=5)
+
+    def _store_local_notification(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        payload["id"] = next(self._notification_ids)
+        self._local_notifications[payload["owner_email"]].appendleft(payload)
         return payload
 
+    def _enqueue_notification(self, payload: Dict[str, Any]) -> None:
+        with self._notification_lock:
+            if self._notification_flusher is None:
+                self._notification_flusher = threading.Thread(
+                    target=self._run_notification_flusher,
+                    name="notification-flusher",
+                    daemon=True,
+                )
+                self._notification_flusher.start()
+        try:
+            self._notification_queue.put_nowait(payload)
+        except queue.Full:
+            # Callers sit on the event loop, so an inline write would stall every request.
+            logger.warning(
+                "Notification queue is full; dropping %s for %s.",
+                payload.get("event_type"),
+                payload.get("verification_id"),
+            )
+
+    def _run_notification_flusher(self) -> None:
+        while True:
+            item = self._notification_queue.get()
+            if item is _FLUSH_STOP:
+                return
+            batch = [item]
+            stopping = False
+            deadline = time.monotonic() + NOTIFICATION_FLUSH_SECONDS
+            while len(batch) < NOTIFICATION_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._notification_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _FLUSH_STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write_notification_batch(batch)
+            if stopping:
+                return
+
+    def _write_notification_batch(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            self.client.table("user_notifications").insert(batch).execute()
+        except Exception as exc:
+            if not self._is_schema_compat_error(exc):
+                if len(batch) > 1 and self._is_row_error(exc):
+                    # A multi-row insert is all-or-nothing; one bad row (e.g. a proof deleted
+                    # in the meantime) must not drop the rest of the batch.
+                    for payload in batch:
+                        self._write_notification_batch([payload])
+                    return
+                logger.warning(
+                    "Failed to persist %d notification(s), first %s for %s. Error=%s",
+                    len(batch),
+                    batch[0].get("event_type"),
+                    batch[0].get("verification_id"),
+                    exc,
+                )
+                return
+            self._warn_schema_fallback(
+                "user_notifications_insert",
+                "Table user_notifications is missing. Notification write will fallback to local memory.",
+                exc,
+            )
+            for payload in batch:
+                self._store_local_notification(payload)
+
     def list_notifications(self, owner_email: str, limit: int = 50) -> List[Dict[str, Any]]:
         if self.client:
             try:
@@ -393,11 +625,10 @@ class SupabaseRepository:
                     "Table user_notifications is missing. Notification reads will fallback to local memory.",
                     exc,
                 )
-        filtered = [
-            item for item in self._local_notifications if item.get("owner_email") == owner_email
-        ]
-        filtered.sort(key=lambda item: item.get("created_at", ""), reverse=True)
-        return filtered[:limit]
+        notifications = self._local_notifications.get(owner_email)
+        if not notifications:
+            return []
+        return list(itertools.islice(notifications, limit))
 
     def mark_notification_read(self, notification_id: int, owner_email: str) -> bool:
         if self.client:
@@ -419,14 +650,14 @@ class SupabaseRepository:
                     exc,
                 )
 
-        for item in self._local_notifications:
-            if item.get("id") == notification_id and item.get("owner_email") == owner_email:
+        for item in self._local_notifications.get(owner_email, ()):
+            if item.get("id") == notification_id:
                 item["read_at"] = self.now_iso()
                 return True
         return False
 
     def delete_proof(self, verification_id: str, owner_email: str) -> Optional[Dict[str, Any]]:
-        proof = self.get_proof(verification_id)
+        proof = self.get_proof(verification_id, fresh=True)
         if not proof:
             return None
         if proof.get("owner_email") != owner_email:
@@ -438,24 +669,30 @@ class SupabaseRepository:
             self.client.table(self.settings.supabase_table).delete().eq(
                 "verification_id", verification_id
             ).eq("owner_email", owner_email).execute()
+            self._forget_proof(proof)
             self._remove_memory_share_links_for_verification(verification_id)
             return proof
 
-        proofs = self._read_local_proofs()
-        proofs = [item for item in proofs if item.get("verification_id") != verification_id]
-        self._overwrite_local_ledgers(proofs)
+        with self._ledger_guard():
+            self._sync_local_index()
+            self._unindex_proof(verification_id)
+            self._overwrite_local_ledgers(self._proofs_by_recency)
         self._remove_memory_share_links_for_verification(verification_id)
         return proof
 
     def delete_vault_blob(self, path: Optional[str]) -> None:
-        if not path:
+        self.delete_vault_blobs([path])
+
+    def delete_vault_blobs(self, paths: List[Optional[str]]) -> None:
+        targets = [path for path in paths if path]
+        if not targets:
             return
         if not self.client:
             return
         try:
-            self.client.storage.from_(self.settings.supabase_bucket).remove([path])
+            self.client.storage.from_(self.settings.supabase_bucket).remove(targets)
         except Exception:
-            logger.warning("Failed to remove storage path %s", path)
+            logger.warning("Failed to remove storage paths %s", ", ".join(targets))
 
     def cleanup_expired_proofs(self, limit: int = 100) -> int:
         if self.client:
@@ -469,11 +706,16 @@ class SupabaseRepository:
                     .execute()
                 )
                 rows = response.data or []
-                for row in rows:
-                    self.delete_vault_blob(row.get("storage_path"))
-                    self.client.table(self.settings.supabase_table).delete().eq(
-                        "verification_id", row["verification_id"]
-                    ).execute()
+                if not rows:
+                    return 0
+                self.delete_vault_blobs([row.get("storage_path") for row in rows])
+                expired_ids = [row["verification_id"] for row in rows]
+                self.client.table(self.settings.supabase_table).delete().in_(
+                    "verification_id", expired_ids
+                ).execute()
+                with self._cache_lock:
+                    for verification_id in expired_ids:
+                        self._proof_cache.pop(verification_id, None)
                 return len(rows)
             except Exception as exc:
                 if not self._is_schema_compat_error(exc):
@@ -485,37 +727,51 @@ class SupabaseRepository:
                 )
                 return 0
 
-        proofs = self._read_local_proofs()
-        now = datetime.now(timezone.utc)
-        kept: List[Dict[str, Any]] = []
-        removed = 0
-        for proof in proofs:
-            auto_delete_at = proof.get("auto_delete_at")
-            if not auto_delete_at:
-                kept.append(proof)
-                continue
-            try:
-                expires = datetime.fromisoformat(auto_delete_at)
-                if expires <= now:
-                    removed += 1
+        with self._ledger_guard():
+            self._sync_local_index()
+            now = datetime.now(timezone.utc)
+            kept: List[Dict[str, Any]] = []
+            removed = 0
+            for proof in self._proofs_by_recency:
+                auto_delete_at = proof.get("auto_delete_at")
+                if not auto_delete_at:
+                    kept.append(proof)
                     continue
-            except Exception:
-                pass
-            kept.append(proof)
-        if removed > 0:
-            self._overwrite_local_ledgers(kept)
+                try:
+                    expires = datetime.fromisoformat(auto_delete_at)
+                    if expires <= now:
+                        removed += 1
+                        continue
+                except Exception:
+                    pass
+                kept.append(proof)
+            if removed > 0:
+                self._rebuild_local_index(kept)
+                self._overwrite_local_ledgers(kept)
         return removed
 
-    def upload_vault_blob(self, path: str, payload: bytes) -> Optional[str]:
-        if self.client:
-            self.client.storage.from_(self.settings.supabase_bucket).upload(
-                path=path,
-                file=payload,
-                file_options={"content-type": "application/octet-stream", "upsert": "true"},
-            )
+    def upload_vault_blob(
+        self, path: str, source: Union[bytes, BinaryIO, Path]
+    ) -> Optional[str]:
+        if not self.client:
             return path
+        if isinstance(source, Path):
+            with open(source, "rb", buffering=VAULT_IO_BUFFER_SIZE) as handle:
+                self._upload_vault_file(path, handle)
+        elif isinstance(source, (bytes, io.BufferedReader)):
+            self._upload_vault_file(path, source)
+        else:
+            # storage3 only streams real file handles; other readers are buffered.
+            self._upload_vault_file(path, source.read())
         return path
 
+    def _upload_vault_file(self, path: str, file: Union[bytes, BinaryIO]) -> None:
+        self.client.storage.from_(self.settings.supabase_bucket).upload(
+            path=path,
+            file=file,
+            file_options={"content-type": "application/octet-stream", "upsert": "true"},
+        )
+
     def download_vault_blob(self, path: str) -> Optional[bytes]:
         if not self.client:
             return None
@@ -525,31 +781,149 @@ class SupabaseRepository:
         return None
 
     def _append_local_ledgers(self, proof: Dict[str, Any]) -> None:
+        line = orjson.dumps(proof) + b"\n"
+        before = self._ledger_signature()
         for target in (self._node_a_path, self._node_b_path):
             target.parent.mkdir(parents=True, exist_ok=True)
-            ledger = []
-            if target.exists():
-                ledger = json.loads(target.read_text(encoding="utf-8"))
-            ledger.append(proof)
-            target.write_text(json.dumps(ledger, indent=2), encoding="utf-8")
+            with target.open("a+b") as handle:
+                # Start on a fresh line if a crash left an unterminated fragment behind.
+                handle.seek(0, os.SEEK_END)
+                prefix = b""
+                if handle.tell():
+                    handle.seek(-1, os.SEEK_END)
+                    if handle.read(1) != b"\n":
+                        prefix = b"\n"
+                handle.write(prefix + line)
+        # Only adopt the new stamp if nobody else wrote since our last sync; otherwise
+        # leave it stale so the next sync reparses and picks up the other writer's proofs.
+        if before == self._ledger_stamp:
+            self._ledger_stamp = self._ledger_signature()
 
     def _overwrite_local_ledgers(self, proofs: List[Dict[str, Any]]) -> None:
+        content = b"".join(orjson.dumps(proof) + b"\n" for proof in proofs)
         for target in (self._node_a_path, self._node_b_path):
             target.parent.mkdir(parents=True, exist_ok=True)
-            target.write_text(json.dumps(proofs, indent=2), encoding="utf-8")
+        # Write both replicas to uniquely named temp files and fsync them before swapping
+        # either in, so a crash leaves the previous ledger intact rather than a truncated one.
+        fd_a, name_a = tempfile.mkstemp(dir=self._node_a_path.parent, suffix=".tmp")
+        fd_b, name_b = tempfile.mkstemp(dir=self._node_b_path.parent, suffix=".tmp")
+        os.close(fd_b)
+        tmp_a, tmp_b = Path(name_a), Path(name_b)
+        try:
+            with open(fd_a, "wb") as handle:
+                handle.write(content)
+                handle.flush()
+                os.fsync(handle.fileno())
+            # Replicate node A in-kernel (sendfile/copy_file_range) instead of writing twice.
+            shutil.copyfile(tmp_a, tmp_b)
+            with tmp_b.open("rb") as handle:
+                os.fsync(handle.fileno())
+            os.replace(tmp_a, self._node_a_path)
+            os.replace(tmp_b, self._node_b_path)
+        finally:
+            tmp_a.unlink(missing_ok=True)
+            tmp_b.unlink(missing_ok=True)
+        self._ledger_stamp = self._ledger_signature()
 
     def _read_local_proofs(self) -> List[Dict[str, Any]]:
-        if not self._node_a_path.exists():
-            return []
+        proofs, unreadable = self._parse_local_ledger()
+        if unreadable:
+            # Never repair from the read path; startup compaction handles it.
+            logger.warning("Skipping %d unreadable lines in %s", unreadable, self._node_a_path)
+        return proofs
+
+    def _parse_local_ledger(self) -> Tuple[List[Dict[str, Any]], int]:
+        try:
+            raw = self._node_a_path.read_bytes()
+        except OSError:
+            return [], 0
+        lines = raw.split(b"\n")
+        # The last element is an unterminated fragment (or b""); an append may still be
+        # in flight, so it is skipped without counting it as damage.
+        lines.pop()
+        proofs: List[Dict[str, Any]] = []
+        unreadable = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                proofs.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                unreadable += 1
+        return proofs, unreadable
+
+    def _compact_local_ledgers(self) -> None:
+        # Runs once at startup under _ledger_guard(): drop torn lines a crash left behind.
+        try:
+            raw = self._node_a_path.read_bytes()
+        except OSError:
+            return
+        proofs, unreadable = self._parse_local_ledger()
+        if unreadable or (raw and not raw.endswith(b"\n")):
+            logger.warning("Compacting %s: dropping unreadable lines", self._node_a_path)
+            self._overwrite_local_ledgers(proofs)
+            self._rebuild_local_index(proofs)
+
+    def _ledger_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = self._node_a_path.stat()
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _sync_local_index(self) -> None:
+        # Another worker may have written the ledger; reparse only when the file changed.
+        # The stamp is taken before reading so a write that races the read forces a
+        # reparse next time instead of being covered by a stamp we never parsed.
+        signature = self._ledger_signature()
+        if signature == self._ledger_stamp:
+            return
+        self._rebuild_local_index(self._read_local_proofs())
+        self._ledger_stamp = signature
+
+    def _rebuild_local_index(self, proofs: List[Dict[str, Any]]) -> None:
+        self._proof_index = {}
+        self._proofs_by_recency = []
+        self._proofs_by_owner = {}
+        for proof in sorted(proofs, key=_created_at_key):
+            self._index_proof(proof)
+
+    def _index_proof(self, proof: Dict[str, Any]) -> None:
+        # Both lists stay in ascending created_at order; new proofs usually land at the end.
+        self._proof_index[proof["verification_id"]] = proof
+        bisect.insort(self._proofs_by_recency, proof, key=_created_at_key)
+        owner_proofs = self._proofs_by_owner.setdefault(proof.get("owner_email") or "", [])
+        bisect.insort(owner_proofs, proof, key=_created_at_key)
+
+    def _unindex_proof(self, verification_id: str) -> None:
+        proof = self._proof_index.pop(verification_id, None)
+        if proof is None:
+            return
+        _remove_identical(self._proofs_by_recency, proof)
+        _remove_identical(self._proofs_by_owner.get(proof.get("owner_email") or "", []), proof)
+
+    def _migrate_legacy_ledgers(self) -> None:
+        # Ledgers used to be a single JSON array rewritten on every insert.
+        legacy_path = self._node_a_path.with_suffix(".json")
+        if self._node_a_path.exists() or not legacy_path.exists():
+            return
         try:
-            return json.loads(self._node_a_path.read_text(encoding="utf-8"))
+            proofs = orjson.loads(legacy_path.read_bytes())
         except Exception:
-            return []
+            logger.warning("Could not read legacy ledger %s; starting a new one.", legacy_path)
+            return
+        self._overwrite_local_ledgers(proofs)
+        # The rewrite advanced the stamp, so the following sync would not index these.
+        self._rebuild_local_index(proofs)
 
     @staticmethod
     def _default_handle(email: str) -> str:
         prefix = email.split("@")[0].lower()
-        cleaned = re.sub(r"[^a-z0-9_.-]+", "", prefix).strip("._-")
+        if prefix.isascii():
+            cleaned = prefix.translate(_HANDLE_ASCII_TABLE)
+        else:
+            cleaned = _HANDLE_RE.sub("", prefix)
+        cleaned = cleaned.strip("._-")
         return cleaned or "aegis_user"
 
     def _default_profile(self, user_id: str, email: str) -> Dict[str, Any]:
@@ -567,6 +941,22 @@ class SupabaseRepository:
             "updated_at": now,
         }
 
+    def _cache_get(self, cache: TTLCache, key: str) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            return cache.get(key)
+
+    def _cache_put(self, cache: TTLCache, key: str, value: Dict[str, Any]) -> None:
+        with self._cache_lock:
+            cache[key] = value
+
+    def _cache_pop(self, cache: TTLCache, key: str) -> None:
+        with self._cache_lock:
+            cache.pop(key, None)
+
+    def _forget_proof(self, proof: Dict[str, Any]) -> None:
+        with self._cache_lock:
+            self._proof_cache.pop(proof.get("verification_id"), None)
+
     def _warn_schema_fallback(self, key: str, message: str, exc: Exception) -> None:
         if key in self._schema_warning_cache:
             return
@@ -574,10 +964,7 @@ class SupabaseRepository:
         logger.warning("%s Error=%s", message, exc)
 
     def _remove_memory_share_links_for_verification(self, verification_id: str) -> None:
-        stale_tokens = [
-            token for token, value in self._memory_share_links.items() if value == verification_id
-        ]
-        for token in stale_tokens:
+        for token in self._tokens_by_vid.pop(verification_id, ()):
             self._memory_share_links.pop(token, None)
 
     @staticmethod
@@ -589,12 +976,11 @@ class SupabaseRepository:
         if code in {"42703", "42P01", "PGRST205"}:
             return True
 
-        lowered = str(exc).lower()
-        return (
-            "does not exist" in lowered
-            or "schema cache" in lowered
-            or "could not find the table" in lowered
-        )
+        return _SCHEMA_ERROR_RE.search(str(exc)) is not None
+
+    @staticmethod
+    def _is_row_error(exc: Exception) -> bool:
+        return isinstance(exc, APIError) and str(exc.code or "").startswith(_ROW_ERROR_CLASSES)
 
     @staticmethod
     def now_iso() -> str:
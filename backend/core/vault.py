@@ -3,18 +3,31 @@ from __future__ import annotations
 import base64
 import hashlib
 import os
-from dataclasses import dataclass
-from datetime import datetime, timezone
+import threading
+import weakref
 
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 
-@dataclass(frozen=True)
-class EncryptedPayload:
-    payload: bytes
-    key_fingerprint: str
-    nonce_b64: str
-    encrypted_at: str
+NONCE_SIZE = 12
+
+
+class VaultEncryptor:
+    def __init__(self, key: bytes, nonce: bytes, key_fingerprint: str):
+        self.nonce = nonce
+        self.key_fingerprint = key_fingerprint
+        self._context = Cipher(algorithms.AES(key), modes.GCM(nonce)).encryptor()
+
+    @property
+    def nonce_b64(self) -> str:
+        return base64.b64encode(self.nonce).decode("utf-8")
+
+    def update(self, chunk: bytes) -> bytes:
+        return self._context.update(chunk)
+
+    def finalize(self) -> bytes:
+        return self._context.finalize() + self._context.tag
 
 
 class VaultCipher:
@@ -22,6 +35,19 @@ class VaultCipher:
         self._key = self._materialize_key(raw_key)
         self._aesgcm = AESGCM(self._key)
         self._key_fingerprint = hashlib.sha256(self._key).hexdigest()[:16]
+        # 96-bit GCM nonces: random 64-bit prefix per process + 32-bit message counter.
+        self._reset_nonce_state()
+        if hasattr(os, "register_at_fork"):
+            # Forked workers (e.g. gunicorn --preload) must not reuse the parent's prefix.
+            cipher_ref = weakref.ref(self)
+            os.register_at_fork(
+                after_in_child=lambda: (cipher := cipher_ref()) and cipher._reset_nonce_state()
+            )
+
+    def _reset_nonce_state(self) -> None:
+        self._nonce_lock = threading.Lock()
+        self._nonce_prefix = os.urandom(8)
+        self._nonce_counter = 0
 
     @staticmethod
     def _materialize_key(raw_key: str) -> bytes:
@@ -46,18 +72,20 @@ class VaultCipher:
             b"project-aegis-dev-key-change-in-production"
         ).digest()
 
-    def encrypt(self, plaintext: bytes) -> EncryptedPayload:
-        nonce = os.urandom(12)
-        ciphertext = self._aesgcm.encrypt(nonce, plaintext, None)
-        blob = nonce + ciphertext
-        return EncryptedPayload(
-            payload=blob,
-            key_fingerprint=self._key_fingerprint,
-            nonce_b64=base64.b64encode(nonce).decode("utf-8"),
-            encrypted_at=datetime.now(timezone.utc).isoformat(),
-        )
+    def _next_nonce(self) -> bytes:
+        with self._nonce_lock:
+            if self._nonce_counter > 0xFFFFFFFF:
+                self._nonce_prefix = os.urandom(8)
+                self._nonce_counter = 0
+            counter = self._nonce_counter
+            self._nonce_counter += 1
+            return self._nonce_prefix + counter.to_bytes(4, "big")
+
+    def encryptor(self) -> VaultEncryptor:
+        # Blob layout: encryptor.nonce, then every update() chunk, then finalize().
+        return VaultEncryptor(self._key, self._next_nonce(), self._key_fingerprint)
 
     def decrypt(self, payload: bytes) -> bytes:
-        nonce = payload[:12]
-        ciphertext = payload[12:]
-        return self._aesgcm.decrypt(nonce, ciphertext, None)
+        # Slice through a memoryview so the ciphertext is not copied before decryption.
+        view = memoryview(payload)
+        return self._aesgcm.decrypt(view[:NONCE_SIZE], view[NONCE_SIZE:], None)
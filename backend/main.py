@@ -1,19 +1,42 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import hashlib
+import logging
 import re
 import secrets
+import tempfile
+import time
 import uuid
-from typing import Any, Optional
-
-from fastapi import Depends, FastAPI, File, HTTPException, Query, UploadFile, WebSocket
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Optional
+
+import orjson
+from cachetools import TLRUCache
+from fastapi import (
+    Depends,
+    FastAPI,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    WebSocket,
+)
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from core.hasher import generate_hash
+from core.hasher import generate_hash_stream
 from core.models import (
+    BatchProofResponse,
     DeleteProofResponse,
     HealthResponse,
-    NotificationItem,
     NotificationsResponse,
     ProfileResponse,
     ProfileUpdateRequest,
@@ -27,29 +50,67 @@ from core.p2p_node import ConnectionManager, PeerBroadcaster
 from core.pqc_engine import PQCEngine
 from core.settings import Settings, get_settings
 from core.supabase_repo import SupabaseRepository
-from core.vault import VaultCipher
+from core.vault import VaultCipher, VaultEncryptor
+
+MAX_BATCH_FILES = 20
+CLEANUP_BATCH_SIZE = 100
+ANONYMOUS_EMAIL = "anonymous@aegis.local"
+
+logger = logging.getLogger(__name__)
+
+_MASK_BUF = "*" * 64
+_FILENAME_RE = re.compile(r"[^a-zA-Z0-9_.-]+")
+_HANDLE_RE = re.compile(r"[^a-z0-9_.-]+")
 
 
 def _clean_filename(name: str) -> str:
     base = name.strip() or "unnamed"
-    return re.sub(r"[^a-zA-Z0-9_.-]+", "_", base)
+    return _FILENAME_RE.sub("_", base)
 
 
 def _clean_handle(value: str) -> str:
     candidate = value.strip().lower()
-    candidate = re.sub(r"[^a-z0-9_.-]+", "", candidate)
+    candidate = _HANDLE_RE.sub("", candidate)
     return candidate.strip("._-")
 
 
+def _token_cache_key(access_token: str) -> bytes:
+    # Only a digest of the bearer token is kept in memory, never the token itself.
+    return hashlib.sha256(access_token.encode("utf-8")).digest()[:16]
+
+
+def _token_seconds_left(access_token: str) -> Optional[float]:
+    try:
+        payload_b64 = access_token.split(".")[1]
+        padded = payload_b64 + "=" * (-len(payload_b64) % 4)
+        payload = orjson.loads(base64.urlsafe_b64decode(padded))
+        return float(payload["exp"]) - time.time()
+    except Exception:
+        return None
+
+
+def _etag_response(request: Request, content: Any) -> Response:
+    # The frontend also writes these tables directly, so the ETag is derived from
+    # the rendered body rather than from a server-side change counter.
+    body = orjson.dumps(content)
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 def _mask_owner_email(email: str) -> str:
-    if "@" not in email:
+    local, sep, domain = email.partition("@")
+    if not sep:
         return "hidden"
-    local, domain = email.split("@", 1)
     if len(local) <= 2:
-        masked_local = local[0] + "*" if local else "*"
-    else:
-        masked_local = local[:2] + "*" * (len(local) - 2)
-    return f"{masked_local}@{domain}"
+        return f"{local[:1]}*@{domain}"
+    stars = len(local) - 2
+    # RFC 5321 caps the local part at 64 chars, so the shared buffer covers real addresses.
+    mask = _MASK_BUF[:stars] if stars <= len(_MASK_BUF) else "*" * stars
+    return f"{local[:2]}{mask}@{domain}"
 
 
 settings = get_settings()
@@ -59,9 +120,56 @@ vault = VaultCipher(settings.vault_master_key)
 peer_broadcaster = PeerBroadcaster(settings.p2p_peers_list)
 ws_manager = ConnectionManager()
 
+# The signing keypair and backend are fixed for the process lifetime.
+_PQC_INFO = pqc_engine.info
+_PUBLIC_KEY_B64 = pqc_engine.export_public_key_b64()
+_HEALTH = HealthResponse(
+    status="ok",
+    environment=settings.app_env,
+    pqc_algorithm=_PQC_INFO.algorithm,
+    pqc_backend=_PQC_INFO.backend,
+    pqc_fallback_active=_PQC_INFO.fallback_active,
+    supabase_enabled=repository.enabled,
+)
+
 auth_scheme = HTTPBearer(auto_error=False)
+# Entries are (user_context, ttl_seconds); each expires at min(configured TTL, token exp).
+_token_cache: TLRUCache = TLRUCache(
+    maxsize=settings.auth_cache_size, ttu=lambda _key, value, now: now + value[1]
+)
+
+
+async def _cleanup_expired_loop() -> None:
+    while True:
+        try:
+            await run_in_threadpool(repository.cleanup_expired_proofs, CLEANUP_BATCH_SIZE)
+        except Exception as exc:
+            logger.warning("Expired proof cleanup failed: %s", exc)
+        await asyncio.sleep(settings.cleanup_interval_seconds)
 
-app = FastAPI(title=settings.app_name, version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    await peer_broadcaster.start()
+    cleanup_task = asyncio.create_task(_cleanup_expired_loop())
+    try:
+        yield
+    finally:
+        cleanup_task.cancel()
+        try:
+            await cleanup_task
+        except asyncio.CancelledError:
+            pass
+        await peer_broadcaster.stop()
+        repository.close()
+
+
+app = FastAPI(
+    title=settings.app_name,
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins_list or ["*"],
@@ -71,24 +179,40 @@ app.add_middleware(
 )
 
 
+def _authenticated_context(access_token: str) -> dict[str, Any]:
+    cache_key = _token_cache_key(access_token)
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        return cached[0]
+    user = repository.get_user_from_token(access_token)
+    if not user:
+        _token_cache.pop(cache_key, None)
+        raise HTTPException(status_code=401, detail="Invalid or expired access token.")
+    user_context = {"id": user["id"], "email": user["email"], "is_authenticated": True}
+    ttl = float(settings.auth_cache_ttl_seconds)
+    seconds_left = _token_seconds_left(access_token)
+    if seconds_left is not None:
+        ttl = min(ttl, seconds_left)
+    if ttl > 0:
+        _token_cache[cache_key] = (user_context, ttl)
+    return user_context
+
+
 async def resolve_user_context(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(auth_scheme),
 ) -> dict[str, Any]:
-    default_email = "anonymous@aegis.local"
-    if not credentials:
-        return {"id": None, "email": default_email, "is_authenticated": False}
-    if not repository.enabled:
-        return {"id": None, "email": default_email, "is_authenticated": False}
-    user = repository.get_user_from_token(credentials.credentials)
-    if not user:
-        raise HTTPException(status_code=401, detail="Invalid or expired access token.")
-    return {"id": user["id"], "email": user["email"], "is_authenticated": True}
+    if not credentials or not repository.enabled:
+        return {"id": None, "email": ANONYMOUS_EMAIL, "is_authenticated": False}
+    return dict(_authenticated_context(credentials.credentials))
 
 
 async def resolve_owner_email(
-    user_context: dict[str, Any] = Depends(resolve_user_context),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(auth_scheme),
 ) -> str:
-    return str(user_context["email"])
+    # Guests never build a user-context dict; signed-in callers share the token cache.
+    if not credentials or not repository.enabled:
+        return ANONYMOUS_EMAIL
+    return str(_authenticated_context(credentials.credentials)["email"])
 
 
 async def require_authenticated_user(
@@ -106,15 +230,7 @@ def index() -> dict:
 
 @app.get(f"{settings.api_prefix}/health", response_model=HealthResponse)
 def health() -> HealthResponse:
-    info = pqc_engine.info
-    return HealthResponse(
-        status="ok",
-        environment=settings.app_env,
-        pqc_algorithm=info.algorithm,
-        pqc_backend=info.backend,
-        pqc_fallback_active=info.fallback_active,
-        supabase_enabled=repository.enabled,
-    )
+    return _HEALTH
 
 
 @app.get(f"{settings.api_prefix}/profile/me", response_model=ProfileResponse)
@@ -122,7 +238,7 @@ async def get_my_profile(
     user: dict[str, str] = Depends(require_authenticated_user),
 ) -> ProfileResponse:
     profile = repository.get_or_create_profile(user["id"], user["email"])
-    return ProfileResponse(**profile)
+    return ProfileResponse.model_construct(**profile)
 
 
 @app.put(f"{settings.api_prefix}/profile/me", response_model=ProfileResponse)
@@ -145,7 +261,7 @@ async def update_my_profile(
         updates["bio"] = str(updates["bio"]).strip()[:280]
 
     profile = repository.update_profile(user["id"], user["email"], updates)
-    return ProfileResponse(**profile)
+    return ProfileResponse.model_construct(**profile)
 
 
 @app.post(f"{settings.api_prefix}/proofs/upload", response_model=ProofResponse)
@@ -153,40 +269,129 @@ async def upload_and_sign_file(
     file: UploadFile = File(...),
     owner_email: str = Depends(resolve_owner_email),
 ) -> ProofResponse:
-    content = await file.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="File is empty.")
+    encryptor, spool_path, hash_value, size_bytes = await _spool_upload(file)
+    try:
+        if not size_bytes:
+            raise HTTPException(status_code=400, detail="File is empty.")
+
+        return await _issue_proof(
+            file.filename or "unnamed",
+            size_bytes,
+            hash_value,
+            owner_email,
+            spool_path,
+            encryptor.nonce_b64,
+            encryptor.key_fingerprint,
+        )
+    finally:
+        spool_path.unlink(missing_ok=True)
 
-    hash_value = generate_hash(content)
-    signature = pqc_engine.sign_hash(hash_value)
+
+async def _spool_upload(upload: UploadFile) -> tuple[VaultEncryptor, Path, str, int]:
+    encryptor = vault.encryptor()
+    spool = tempfile.NamedTemporaryFile(prefix="aegis-", suffix=".aegis", delete=False)
+    spool_path = Path(spool.name)
+    try:
+        with spool:
+            hash_value, size_bytes = await _ingest_upload(upload, encryptor, spool)
+    except BaseException:
+        spool_path.unlink(missing_ok=True)
+        raise
+    return encryptor, spool_path, hash_value, size_bytes
+
+
+async def _ingest_upload(
+    upload: UploadFile, encryptor: VaultEncryptor, sink: BinaryIO
+) -> tuple[str, int]:
+    # Single pass per chunk: hash, encrypt and spool while the chunk is still hot,
+    # so neither the plaintext nor the ciphertext is held in full.
+    sink.write(encryptor.nonce)
+    hash_value, size_bytes = await generate_hash_stream(
+        upload, sink=lambda chunk: sink.write(encryptor.update(chunk))
+    )
+    sink.write(encryptor.finalize())
+    return hash_value, size_bytes
+
+
+@app.post(f"{settings.api_prefix}/proofs/upload-batch", response_model=BatchProofResponse)
+async def upload_and_sign_files(
+    files: list[UploadFile] = File(...),
+    owner_email: str = Depends(resolve_owner_email),
+) -> BatchProofResponse:
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_BATCH_FILES} files per batch upload."
+        )
+    # Each file streams through its own spool; the hash/encrypt work overlaps on the pool.
+    results = await asyncio.gather(
+        *(_spool_upload(file) for file in files), return_exceptions=True
+    )
+    spooled = [result for result in results if not isinstance(result, BaseException)]
+    try:
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        for file, (_, _, _, size_bytes) in zip(files, spooled):
+            if not size_bytes:
+                raise HTTPException(status_code=400, detail=f"File is empty: {file.filename}.")
+
+        items = [
+            await _issue_proof(
+                file.filename or "unnamed",
+                size_bytes,
+                hash_value,
+                owner_email,
+                spool_path,
+                encryptor.nonce_b64,
+                encryptor.key_fingerprint,
+            )
+            for file, (encryptor, spool_path, hash_value, size_bytes) in zip(files, spooled)
+        ]
+    finally:
+        for _, spool_path, _, _ in spooled:
+            spool_path.unlink(missing_ok=True)
+    return BatchProofResponse.model_construct(items=items, count=len(items))
+
+
+async def _issue_proof(
+    filename: str,
+    size_bytes: int,
+    hash_value: str,
+    owner_email: str,
+    blob: Path,
+    nonce_b64: str,
+    key_fingerprint: str,
+) -> ProofResponse:
+    signature = await pqc_engine.sign_hash_async(hash_value)
     signature_b64 = pqc_engine.encode_signature_b64(signature)
 
-    signature_valid = pqc_engine.verify_hash(signature, hash_value)
-    status = "VERIFIED" if signature_valid else "TAMPERED"
+    status = "VERIFIED"
+    if settings.pqc_self_verify_on_sign:
+        signature_valid = await pqc_engine.verify_hash_async(signature, hash_value)
+        status = "VERIFIED" if signature_valid else "TAMPERED"
     verification_id = str(uuid.uuid4())
-    clean_name = _clean_filename(file.filename or "unnamed")
+    clean_name = _clean_filename(filename)
 
-    encrypted = vault.encrypt(content)
     storage_path = f"{owner_email}/{verification_id}-{clean_name}.aegis"
-    repository.upload_vault_blob(storage_path, encrypted.payload)
+    await run_in_threadpool(repository.upload_vault_blob, storage_path, blob)
 
     proof = {
         "verification_id": verification_id,
         "filename": clean_name,
-        "size_bytes": len(content),
+        "size_bytes": size_bytes,
         "hash_sha3_512": hash_value,
         "signature_b64": signature_b64,
-        "public_key_b64": pqc_engine.export_public_key_b64(),
-        "pqc_algorithm": pqc_engine.info.algorithm,
-        "pqc_backend": pqc_engine.info.backend,
+        "public_key_b64": _PUBLIC_KEY_B64,
+        "pqc_algorithm": _PQC_INFO.algorithm,
+        "pqc_backend": _PQC_INFO.backend,
         "status": status,
         "owner_email": owner_email,
         "storage_path": storage_path,
-        "vault_nonce_b64": encrypted.nonce_b64,
-        "vault_key_fingerprint": encrypted.key_fingerprint,
+        "vault_nonce_b64": nonce_b64,
+        "vault_key_fingerprint": key_fingerprint,
         "created_at": repository.now_iso(),
     }
-    repository.insert_proof(proof)
+    await run_in_threadpool(repository.insert_proof, proof)
 
     event_payload = {
         "verification_id": verification_id,
@@ -198,10 +403,10 @@ async def upload_and_sign_file(
     await ws_manager.broadcast("proof_created", event_payload)
     await peer_broadcaster.broadcast_integrity_proof(event_payload)
 
-    return ProofResponse(
+    return ProofResponse.model_construct(
         verification_id=verification_id,
         filename=clean_name,
-        size_bytes=len(content),
+        size_bytes=size_bytes,
         hash_sha3_512=hash_value,
         signature_b64=signature_b64,
         public_key_b64=proof["public_key_b64"],
@@ -217,7 +422,7 @@ async def create_share_link(
     verification_id: str,
     user: dict[str, str] = Depends(require_authenticated_user),
 ) -> ShareLinkResponse:
-    proof = repository.get_proof(verification_id)
+    proof = repository.get_proof(verification_id, fresh=True)
     if not proof:
         raise HTTPException(status_code=404, detail="Verification ID not found.")
     if proof.get("owner_email") != user["email"]:
@@ -239,7 +444,7 @@ async def create_share_link(
         },
     )
 
-    return ShareLinkResponse(
+    return ShareLinkResponse.model_construct(
         verification_id=verification_id,
         share_token=share_token,
         share_url=share_url,
@@ -253,7 +458,7 @@ async def get_shared_proof_details(share_token: str) -> SharedProofResponse:
     if not proof:
         raise HTTPException(status_code=404, detail="Shared proof link is invalid or disabled.")
 
-    return SharedProofResponse(
+    return SharedProofResponse.model_construct(
         verification_id=proof["verification_id"],
         filename=proof["filename"],
         pqc_algorithm=proof["pqc_algorithm"],
@@ -271,20 +476,19 @@ async def verify_shared_upload(
     file: UploadFile = File(...),
     user_context: dict[str, Any] = Depends(resolve_user_context),
 ) -> SharedVerifyResponse:
-    content = await file.read()
-    if not content:
+    submitted_hash, submitted_size = await generate_hash_stream(file)
+    if not submitted_size:
         raise HTTPException(status_code=400, detail="File is empty.")
 
     proof = repository.get_proof_by_share_token(share_token)
     if not proof:
         raise HTTPException(status_code=404, detail="Shared proof link is invalid or disabled.")
 
-    signature_valid = pqc_engine.verify_hash_with_public_key(
+    signature_valid = await pqc_engine.verify_hash_with_public_key_async(
         signature=pqc_engine.decode_signature_b64(proof["signature_b64"]),
         hash_value=proof["hash_sha3_512"],
         public_key_b64=proof["public_key_b64"],
     )
-    submitted_hash = generate_hash(content)
     file_hash_match = submitted_hash == proof["hash_sha3_512"]
 
     status = "VERIFIED" if signature_valid and file_hash_match else "TAMPERED"
@@ -300,6 +504,7 @@ async def verify_shared_upload(
         else "guest@aegis.share"
     )
     had_auto_delete = bool(proof.get("auto_delete_at"))
+    checked_at = datetime.now(timezone.utc)
     updated_proof = repository.record_external_check(
         proof=proof,
         checker_email=checker_email,
@@ -308,6 +513,7 @@ async def verify_shared_upload(
         status=status,
         detail=detail,
         auto_delete_after_hours=settings.auto_delete_after_recheck_hours,
+        now=checked_at,
     )
 
     event_type = "SHARED_FILE_TAMPERED" if status == "TAMPERED" else "SHARED_FILE_RECHECKED"
@@ -321,6 +527,7 @@ async def verify_shared_upload(
             f"{checker_email} re-verified shared file "
             f"{proof['filename']} ({status})."
         ),
+        now=checked_at,
     )
 
     if not had_auto_delete and updated_proof.get("auto_delete_at"):
@@ -334,6 +541,7 @@ async def verify_shared_upload(
                 "Auto-delete scheduled after external recheck. "
                 f"Delete before {updated_proof.get('auto_delete_at')} to control lifecycle."
             ),
+            now=checked_at,
         )
 
     await ws_manager.broadcast(
@@ -347,7 +555,7 @@ async def verify_shared_upload(
         },
     )
 
-    return SharedVerifyResponse(
+    return SharedVerifyResponse.model_construct(
         verification_id=proof["verification_id"],
         status=status,
         signature_valid=signature_valid,
@@ -375,7 +583,7 @@ async def verify_proof(
     if repository.enabled and proof.get("owner_email") != owner_email:
         raise HTTPException(status_code=403, detail="You do not own this verification proof.")
 
-    signature_valid = pqc_engine.verify_hash_with_public_key(
+    signature_valid = await pqc_engine.verify_hash_with_public_key_async(
         signature=pqc_engine.decode_signature_b64(proof["signature_b64"]),
         hash_value=proof["hash_sha3_512"],
         public_key_b64=proof["public_key_b64"],
@@ -384,9 +592,13 @@ async def verify_proof(
     detail = "Signature matches ledger hash."
 
     if file is not None:
-        candidate_content = await file.read()
-        candidate_hash = generate_hash(candidate_content)
-        file_hash_match = candidate_hash == proof["hash_sha3_512"]
+        expected_size = proof.get("size_bytes")
+        if file.size is not None and expected_size is not None and file.size != expected_size:
+            # A different length can never hash the same, so skip the SHA3 pass.
+            file_hash_match = False
+        else:
+            candidate_hash, _ = await generate_hash_stream(file)
+            file_hash_match = candidate_hash == proof["hash_sha3_512"]
         detail = (
             "Signature valid and uploaded file hash matches."
             if file_hash_match and signature_valid
@@ -407,7 +619,7 @@ async def verify_proof(
         },
     )
 
-    return VerifyResponse(
+    return VerifyResponse.model_construct(
         verification_id=verification_id,
         status=status,
         signature_valid=signature_valid,
@@ -418,12 +630,12 @@ async def verify_proof(
 
 @app.get(f"{settings.api_prefix}/proofs")
 def list_proofs(
+    request: Request,
     limit: int = Query(default=50, ge=1, le=200),
     owner_email: str = Depends(resolve_owner_email),
-) -> dict:
-    repository.cleanup_expired_proofs(limit=25)
+) -> Response:
     rows = repository.list_proofs(owner_email if repository.enabled else None, limit=limit)
-    return {"items": rows, "count": len(rows)}
+    return _etag_response(request, {"items": rows, "count": len(rows)})
 
 
 @app.delete(
@@ -434,7 +646,7 @@ async def delete_proof(
     verification_id: str,
     user: dict[str, str] = Depends(require_authenticated_user),
 ) -> DeleteProofResponse:
-    proof = repository.get_proof(verification_id)
+    proof = repository.get_proof(verification_id, fresh=True)
     if not proof:
         raise HTTPException(status_code=404, detail="Verification ID not found.")
     if proof.get("owner_email") != user["email"]:
@@ -452,7 +664,7 @@ async def delete_proof(
         },
     )
 
-    return DeleteProofResponse(
+    return DeleteProofResponse.model_construct(
         deleted=True,
         verification_id=verification_id,
         detail="Proof and encrypted vault file deleted.",
@@ -461,13 +673,14 @@ async def delete_proof(
 
 @app.get(f"{settings.api_prefix}/notifications", response_model=NotificationsResponse)
 async def list_notifications(
+    request: Request,
     limit: int = Query(default=50, ge=1, le=200),
     user: dict[str, str] = Depends(require_authenticated_user),
-) -> NotificationsResponse:
-    repository.cleanup_expired_proofs(limit=25)
+) -> Response:
     rows = repository.list_notifications(user["email"], limit=limit)
-    items = [NotificationItem(**row) for row in rows]
-    return NotificationsResponse(items=items, count=len(items))
+    # Returning a Response skips response_model validation, so validate once here.
+    response = NotificationsResponse(items=rows, count=len(rows))
+    return _etag_response(request, response.model_dump())
 
 
 @app.post(f"{settings.api_prefix}/notifications/{{notification_id}}/read")